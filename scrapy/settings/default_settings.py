@@ -40,6 +40,7 @@ __all__ = [
     "COOKIES_DEBUG",
     "COOKIES_ENABLED",
     "CRAWLSPIDER_FOLLOW_LINKS",
+    "CRAWLSPIDER_LINK_CACHE_SIZE",
     "DEFAULT_DROPITEM_LOG_LEVEL",
     "DEFAULT_ITEM_CLASS",
     "DEFAULT_REQUEST_HEADERS",
@@ -169,6 +170,7 @@ __all__ = [
     "SCHEDULER_START_DISK_QUEUE",
     "SCHEDULER_START_MEMORY_QUEUE",
     "SCRAPER_SLOT_MAX_ACTIVE_SIZE",
+    "SITEMAP_PARSER",
     "SPIDER_CONTRACTS",
     "SPIDER_CONTRACTS_BASE",
     "SPIDER_LOADER_CLASS",
@@ -225,6 +227,7 @@ COOKIES_ENABLED = True
 COOKIES_DEBUG = False
 
 CRAWLSPIDER_FOLLOW_LINKS = True
+CRAWLSPIDER_LINK_CACHE_SIZE = 0
 
 DEFAULT_DROPITEM_LOG_LEVEL = "WARNING"
 
@@ -488,6 +491,8 @@ SCHEDULER_START_MEMORY_QUEUE = "scrapy.squeues.FifoMemoryQueue"
 
 SCRAPER_SLOT_MAX_ACTIVE_SIZE = 5000000
 
+SITEMAP_PARSER = "lxml"
+
 SPIDER_CONTRACTS = {}
 SPIDER_CONTRACTS_BASE = {
     "scrapy.contracts.default.UrlContract": 1,
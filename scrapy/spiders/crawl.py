@@ -10,6 +10,8 @@ from __future__ import annotations
 import copy
 import warnings
 from collections.abc import AsyncIterator, Awaitable, Callable
+from operator import attrgetter
+from types import GeneratorType
 from typing import TYPE_CHECKING, Any, TypeAlias, TypeVar, cast
 
 from scrapy.http import HtmlResponse, Request, Response
@@ -17,6 +19,7 @@ from scrapy.link import Link
 from scrapy.linkextractors import LinkExtractor
 from scrapy.spiders import Spider
 from scrapy.utils.asyncgen import collect_asyncgen
+from scrapy.utils.datatypes import LocalCache
 from scrapy.utils.deprecate import method_is_overridden
 from scrapy.utils.python import global_object_name
 from scrapy.utils.spider import iterate_spider_output
@@ -54,7 +57,24 @@ def _get_method(method: Callable | str | None, spider: Spider) -> Callable | Non
     return None
 
 
+def _get_required_method(
+    method: Callable | str | None, spider: Spider, rule_attr: str
+) -> Callable:
+    resolved = _get_method(method, spider)
+    if not callable(resolved):
+        raise TypeError(
+            f"Rule.{rule_attr} must be a callable or the name of a method of "
+            f"{global_object_name(type(spider))}, got {method!r}."
+        )
+    return resolved
+
+
 _default_link_extractor = LinkExtractor()
+_link_url = attrgetter("url")
+
+# Request.meta keys set by CrawlSpider._build_request()
+_META_RULE = "rule"
+_META_LINK_TEXT = "link_text"
 
 
 class Rule:
@@ -78,6 +98,16 @@ class Rule:
         )
         self.follow: bool = follow if follow is not None else not callback
 
+    def _clone(self) -> Self:
+        # a cheaper alternative to copy.copy(), which CrawlSpider uses to get
+        # a copy of each rule that can be compiled for a given spider instance
+        if type(self) is not Rule:
+            # subclasses may define __slots__, __copy__(), etc.
+            return copy.copy(self)
+        rule = type(self).__new__(type(self))
+        rule.__dict__.update(self.__dict__)
+        return rule
+
     def _compile(self, spider: Spider) -> None:
         # this replaces method names with methods and we can't express this in type hints
         self.callback = cast("CallbackT", _get_method(self.callback, spider))
@@ -85,29 +115,48 @@ class Rule:
             "Callable[[Failure], Any]", _get_method(self.errback, spider)
         )
         self.process_links = cast(
-            "ProcessLinksT", _get_method(self.process_links, spider)
+            "ProcessLinksT",
+            _get_required_method(self.process_links, spider, "process_links"),
         )
         self.process_request = cast(
-            "ProcessRequestT", _get_method(self.process_request, spider)
+            "ProcessRequestT",
+            _get_required_method(self.process_request, spider, "process_request"),
         )
+        self._pl_is_identity: bool = self.process_links is _identity
+        self._pr_is_identity: bool = self.process_request is _identity_process_request
 
 
 class CrawlSpider(Spider):
     rules: Sequence[Rule] = ()
-    _rules: list[Rule]
+    _rules: tuple[Rule, ...]
     _follow_links: bool
-
-    def __init__(self, *a: Any, **kw: Any):
-        super().__init__(*a, **kw)
-        self._compile_rules()
-        if method_is_overridden(self.__class__, CrawlSpider, "_parse_response"):
-            warnings.warn(
+    _links_cache: LocalCache[tuple[int, str, bytes], list[Link]] | None = None
+    _parse_response_overridden: bool = False
+    _parse_response_warning: str
+    _process_results_overridden: bool = False
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._parse_response_overridden = method_is_overridden(
+            cls, CrawlSpider, "_parse_response"
+        )
+        if cls._parse_response_overridden:
+            cls._parse_response_warning = (
                 f"The CrawlSpider._parse_response method, which the "
-                f"{global_object_name(self.__class__)} class overrides, is "
+                f"{global_object_name(cls)} class overrides, is "
                 f"deprecated: it will be removed in future Scrapy releases. "
                 f"Please override the CrawlSpider.parse_with_rules method "
                 f"instead."
             )
+        cls._process_results_overridden = method_is_overridden(
+            cls, CrawlSpider, "process_results"
+        )
+
+    def __init__(self, *a: Any, **kw: Any):
+        super().__init__(*a, **kw)
+        self._compile_rules()
+        if self._parse_response_overridden:
+            warnings.warn(self._parse_response_warning)
 
     def _parse(self, response: Response, **kwargs: Any) -> Any:
         return self.parse_with_rules(
@@ -130,35 +179,82 @@ class CrawlSpider(Spider):
             url=link.url,
             callback=self._callback,
             errback=self._errback,
-            meta={"rule": rule_index, "link_text": link.text},
+            meta={_META_RULE: rule_index, _META_LINK_TEXT: link.text},
         )
 
     def _requests_to_follow(self, response: Response) -> Iterable[Request | None]:
+        # This builds a list rather than being a generator, as it is always
+        # consumed entirely and right away by parse_with_rules().
         if not isinstance(response, HtmlResponse):
-            return
-        seen: set[Link] = set()
+            return ()
+        out: list[Request | None] = []
+        out_extend = out.extend
+        build_request = self._build_request
+        seen_urls: set[str] = set()
+        # Rules often share a link extractor (e.g. the default one), so links
+        # are extracted only once per extractor and response. This assumes
+        # that extract_links() returns the same links for the same response.
+        extracted: dict[int, list[Link]] = {}
+        links_cache = self._links_cache
         for rule_index, rule in enumerate(self._rules):
+            link_extractor = rule.link_extractor
+            process_links = cast("ProcessLinksT", rule.process_links)
+            process_request = cast("ProcessRequestT", rule.process_request)
+            extracted_links = extracted.get(id(link_extractor))
+            if extracted_links is None:
+                if links_cache is None:
+                    extracted_links = link_extractor.extract_links(response)
+                else:
+                    extracted_links = self._extract_links_cached(
+                        links_cache, link_extractor, response
+                    )
+                extracted[id(link_extractor)] = extracted_links
             links: list[Link] = [
-                lnk
-                for lnk in rule.link_extractor.extract_links(response)
-                if lnk not in seen
+                lnk for lnk in extracted_links if lnk.url not in seen_urls
             ]
-            for link in cast("ProcessLinksT", rule.process_links)(links):
-                seen.add(link)
-                request = self._build_request(rule_index, link)
-                yield cast("ProcessRequestT", rule.process_request)(request, response)
+            if not rule._pl_is_identity:
+                # The extracted links are shared with the other rules that use
+                # the same link extractor, so process_links gets copies that it
+                # can modify. It may return any iterable, e.g. a generator.
+                links = list(process_links([copy.copy(lnk) for lnk in links]))
+            seen_urls.update(map(_link_url, links))
+            requests = [build_request(rule_index, link) for link in links]
+            if rule._pr_is_identity:
+                out_extend(requests)
+            else:
+                out_extend([process_request(r, response) for r in requests])
+        return out
+
+    @staticmethod
+    def _extract_links_cached(
+        links_cache: LocalCache[tuple[int, str, bytes], list[Link]],
+        link_extractor: LinkExtractor,
+        response: HtmlResponse,
+    ) -> list[Link]:
+        # The rules, and so their link extractors, live as long as the spider,
+        # so their ids are not reused while the cache is in use.
+        key = (id(link_extractor), response.url, response.body)
+        links = links_cache.get(key)
+        if links is None:
+            links = link_extractor.extract_links(response)
+            links_cache[key] = links
+        else:
+            links_cache.move_to_end(key)
+        return links
 
     def _callback(self, response: Response, **cb_kwargs: Any) -> Any:
-        rule = self._rules[cast("int", response.meta["rule"])]
+        rule = self._rules[response.meta[_META_RULE]]
+        if rule.cb_kwargs:
+            cb_kwargs = {**rule.cb_kwargs, **cb_kwargs}
         return self.parse_with_rules(
             response,
-            cast("CallbackT", rule.callback),
-            {**rule.cb_kwargs, **cb_kwargs},
+            rule.callback,
+            cb_kwargs,
             rule.follow,
         )
 
     def _errback(self, failure: Failure) -> Iterable[Any]:
-        rule = self._rules[cast("int", failure.request.meta["rule"])]  # type: ignore[attr-defined]
+        rule = self._rules[failure.request.meta[_META_RULE]]  # type: ignore[attr-defined]
         return self._handle_failure(
             failure, cast("Callable[[Failure], Any]", rule.errback)
         )
@@ -172,12 +268,23 @@ class CrawlSpider(Spider):
     ) -> AsyncIterator[Any]:
         if callback:
             cb_res = callback(response, **cb_kwargs) or ()
-            if isinstance(cb_res, AsyncIterator):
-                cb_res = await collect_asyncgen(cb_res)
-            elif isinstance(cb_res, Awaitable):
-                cb_res = await cb_res
+            # most callbacks return lists or generators, for which the slower
+            # ABC-based checks below can be skipped
+            if not isinstance(cb_res, (list, tuple, GeneratorType)):
+                if isinstance(cb_res, AsyncIterator):
+                    if self._process_results_overridden:
+                        # process_results() needs all the results at once
+                        cb_res = await collect_asyncgen(cb_res)
+                    else:
+                        async for request_or_item in cb_res:
+                            yield request_or_item
+                        cb_res = ()
+                elif isinstance(cb_res, Awaitable):
+                    cb_res = await cb_res
             cb_res = self.process_results(response, cb_res)
-            for request_or_item in iterate_spider_output(cb_res):
+            if not isinstance(cb_res, (list, tuple, GeneratorType)):
+                cb_res = iterate_spider_output(cb_res)
+            for request_or_item in cb_res:
                 yield request_or_item
 
         if follow and self._follow_links:
@@ -207,13 +314,18 @@ class CrawlSpider(Spider):
             yield from iterate_spider_output(results)
 
     def _compile_rules(self) -> None:
-        self._rules = []
+        rules = []
         for rule in self.rules:
-            self._rules.append(copy.copy(rule))
-            self._rules[-1]._compile(self)
+            rule = rule._clone()
+            rule._compile(self)
+            rules.append(rule)
+        self._rules = tuple(rules)
 
     @classmethod
     def from_crawler(cls, crawler: Crawler, *args: Any, **kwargs: Any) -> Self:
         spider = super().from_crawler(crawler, *args, **kwargs)
         spider._follow_links = crawler.settings.getbool("CRAWLSPIDER_FOLLOW_LINKS")
+        links_cache_size = crawler.settings.getint("CRAWLSPIDER_LINK_CACHE_SIZE")
+        if links_cache_size > 0:
+            spider._links_cache = LocalCache(limit=links_cache_size)
         return spider
@@ -11,7 +11,7 @@ from scrapy.http import Request, Response, XmlResponse
 from scrapy.spiders import Spider
 from scrapy.utils._compression import _DecompressionMaxSizeExceeded
 from scrapy.utils.gz import gunzip, gzip_magic_number
-from scrapy.utils.sitemap import Sitemap, sitemap_urls_from_robots
+from scrapy.utils.sitemap import Sitemap, _ExpatSitemap, sitemap_urls_from_robots
 
 if TYPE_CHECKING:
     # typing.Self requires Python 3.11
@@ -22,6 +22,11 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+_SITEMAP_PARSERS: dict[str, type[Sitemap | _ExpatSitemap]] = {
+    "lxml": Sitemap,
+    "expat": _ExpatSitemap,
+}
+
 
 class SitemapSpider(Spider):
     sitemap_urls: Sequence[str] = ()
@@ -32,6 +37,7 @@ class SitemapSpider(Spider):
     sitemap_alternate_links: bool = False
     _max_size: int
     _warn_size: int
+    _sitemap_class: type[Sitemap | _ExpatSitemap] = Sitemap
 
     @classmethod
     def from_crawler(cls, crawler: Crawler, *args: Any, **kwargs: Any) -> Self:
@@ -42,6 +48,13 @@ class SitemapSpider(Spider):
         spider._warn_size = getattr(
             spider, "download_warnsize", spider.settings.getint("DOWNLOAD_WARNSIZE")
         )
+        sitemap_parser = spider.settings.get("SITEMAP_PARSER")
+        if sitemap_parser not in _SITEMAP_PARSERS:
+            raise ValueError(
+                f"Unsupported SITEMAP_PARSER value: {sitemap_parser!r}. "
+                f"Supported values: {', '.join(map(repr, _SITEMAP_PARSERS))}."
+            )
+        spider._sitemap_class = _SITEMAP_PARSERS[sitemap_parser]
         return spider
 
     def __init__(self, *a: Any, **kw: Any):
@@ -84,7 +97,7 @@ class SitemapSpider(Spider):
                 )
                 return
 
-            s = Sitemap(body)
+            s = self._sitemap_class(body)
             it = self.sitemap_filter(s)
 
             if s.type == "sitemapindex":
@@ -114,8 +127,10 @@ class SitemapSpider(Spider):
                 return None
             if uncompressed_size < warn_size <= len(body):
                 logger.warning(
-                    f"{response} body size after decompression ({len(body)} B) "
-                    f"is larger than the download warning size ({warn_size} B)."
+                    "%(response)s body size after decompression (%(size)s B) "
+                    "is larger than the download warning size (%(warn_size)s B).",
+                    {"response": response, "size": len(body), "warn_size": warn_size},
+                    extra={"spider": self},
                 )
             return body
         # actual gzipped sitemap files are decompressed above ;
@@ -127,7 +142,7 @@ class SitemapSpider(Spider):
         # without actually being a .xml.gz file in the first place,
         # merely XML gzip-compressed on the fly,
         # in other word, here, we have plain XML
-        if response.url.endswith(".xml") or response.url.endswith(".xml.gz"):
+        if response.url.endswith((".xml", ".xml.gz")):
             return response.body
         return None
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-import struct
-from gzip import GzipFile
+import zlib
+from gzip import BadGzipFile
 from io import BytesIO
 from typing import TYPE_CHECKING
 
@@ -10,29 +10,110 @@ from ._compression import _CHUNK_SIZE, _check_max_size
 if TYPE_CHECKING:
     from scrapy.http import Response
 
+    _zlib = zlib
+else:
+    try:
+        # ISA-L's zlib-compatible API inflates considerably faster than zlib
+        from isal import isal_zlib as _zlib
+    except ImportError:
+        _zlib = zlib
+
+
+# gzip header flags, see RFC 1952
+_FHCRC = 2
+_FEXTRA = 4
+_FNAME = 8
+_FCOMMENT = 16
+
+
+def _gzip_header_end(data: bytes, pos: int) -> int:
+    """Return the position in *data* right after the header of the gzip member
+    that starts at *pos*."""
+    if data[pos : pos + 2] != b"\x1f\x8b":
+        raise BadGzipFile("Not a gzipped file")
+    if data[pos + 2 : pos + 3] != b"\x08":
+        raise BadGzipFile("Unknown compression method")
+    flags = data[pos + 3] if len(data) > pos + 3 else 0
+    pos += 10
+    if flags & _FEXTRA:
+        pos += 2 + int.from_bytes(data[pos : pos + 2], "little")
+    for flag in (_FNAME, _FCOMMENT):
+        if flags & flag:
+            pos = data.find(b"\x00", pos) + 1
+            if not pos:
+                raise EOFError("Compressed file ended before the header end")
+    if flags & _FHCRC:
+        pos += 2
+    if pos > len(data):
+        raise EOFError("Compressed file ended before the header end")
+    return pos
+
+
+def _check_empty_member_trailer(trailer: bytes) -> None:
+    """Raise the error that :class:`~gzip.GzipFile` raises if *trailer* is not
+    the complete, valid trailer of a gzip member with no data."""
+    if len(trailer) < 8:
+        raise EOFError(
+            "Compressed file ended before the end-of-stream marker was reached"
+        )
+    crc = int.from_bytes(trailer[:4], "little")
+    if crc != 0:
+        raise BadGzipFile(f"CRC check failed {hex(crc)} != 0x0")
+    if trailer[4:] != b"\x00\x00\x00\x00":
+        raise BadGzipFile("Incorrect length of data produced")
+
 
 def gunzip(data: bytes, *, max_size: int = 0) -> bytes:
     """Gunzip the given data and return as much data as possible.
 
     This is resilient to CRC checksum errors.
     """
-    f = GzipFile(fileobj=BytesIO(data))
+    view = memoryview(data)
     output_stream = BytesIO()
-    chunk = b"."
     decompressed_size = 0
-    while chunk:
+    pos = 0
+    while pos < len(data):
         try:
-            chunk = f.read1(_CHUNK_SIZE)
-        except (OSError, EOFError, struct.error):
+            pos = _gzip_header_end(data, pos)
+        except (OSError, EOFError):
             # complete only if there is some data, otherwise re-raise
-            # see issue 87 about catching struct.error
-            # some pages are quite small so output_stream is empty
-            if output_stream.getbuffer().nbytes > 0:
+            if decompressed_size > 0:
                 break
             raise
-        decompressed_size += len(chunk)
-        _check_max_size(decompressed_size, max_size)
-        output_stream.write(chunk)
+        # Raw deflate, so that the checksum in the member trailer is not
+        # verified.
+        decompressor = _zlib.decompressobj(wbits=-zlib.MAX_WBITS)
+        # The input is fed in bounded slices, as unconsumed_tail is a copy of
+        # the input left after each call.
+        while not decompressor.eof and pos < len(data):
+            input_data: memoryview | bytes = view[pos : pos + _CHUNK_SIZE]
+            pos += len(input_data)
+            while True:
+                try:
+                    chunk = decompressor.decompress(input_data, _CHUNK_SIZE)
+                except _zlib.error as e:
+                    # raise zlib.error regardless of the decompression backend
+                    raise zlib.error(*e.args) from e
+                decompressed_size += len(chunk)
+                _check_max_size(decompressed_size, max_size)
+                output_stream.write(chunk)
+                input_data = decompressor.unconsumed_tail
+                if decompressor.eof or (not input_data and len(chunk) < _CHUNK_SIZE):
+                    break
+        if not decompressor.eof:
+            if decompressed_size > 0:
+                break
+            raise EOFError(
+                "Compressed file ended before the end-of-stream marker was reached"
+            )
+        # skip the member trailer (CRC32 and ISIZE) and any zero padding
+        pos -= len(decompressor.unused_data)
+        if decompressed_size == 0:
+            # there is no data to return yet, so errors are not ignored
+            _check_empty_member_trailer(data[pos : pos + 8])
+        pos += 8
+        while data[pos : pos + 1] == b"\x00":
+            pos += 1
     return output_stream.getvalue()
 
 
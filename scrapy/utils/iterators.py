@@ -3,8 +3,8 @@ from __future__ import annotations
 import csv
 import logging
 import re
-from io import StringIO
-from typing import TYPE_CHECKING, Any, Literal, cast, overload
+from io import BytesIO, StringIO, TextIOWrapper
+from typing import IO, TYPE_CHECKING, Any, Literal, cast, overload
 from warnings import warn
 
 from lxml import etree
@@ -118,7 +118,11 @@ def xmliter_lxml(
         xs = Selector(text=nodetext, type="xml")
         if namespace:
             xs.register_namespace(prefix, namespace)
-        yield xs.xpath(selxpath)[0]
+        # The node is the root of its own document, so there is no need to
+        # evaluate selxpath, which would walk the whole node, to find it.
+        yield Selector(
+            root=xs.root, _expr=selxpath, namespaces=xs.namespaces, type="xml"
+        )
 
 
 class _StreamReader:
@@ -175,6 +179,10 @@ def csviter(
     for the returned dictionaries, if not the first row is used.
 
     quotechar is the character used to enclosure fields on the given obj.
+
+    A binary obj (i.e. bytes or a Response that is not a TextResponse) is
+    decoded as it is read, so if it is not valid UTF-8, UnicodeDecodeError is
+    raised only once the invalid part is reached, after the rows before it.
     """
 
     if encoding is not None:  # pragma: no cover
@@ -185,7 +193,14 @@ def csviter(
             stacklevel=2,
         )
 
-    lines = StringIO(_body_or_str(obj, unicode=True))
+    lines: IO[str]
+    if isinstance(obj, (bytes, Response)) and not isinstance(obj, TextResponse):
+        # decode UTF-8 bodies as they are read instead of all at once
+        lines = TextIOWrapper(
+            BytesIO(_body_or_str(obj, unicode=False)), encoding="utf-8", newline="\n"
+        )
+    else:
+        lines = StringIO(_body_or_str(obj, unicode=True))
 
     kwargs: dict[str, Any] = {}
     if delimiter:
@@ -7,8 +7,12 @@ SitemapSpider, its API is subject to change without notice.
 
 from __future__ import annotations
 
+from datetime import datetime
+from io import BytesIO
+from itertools import chain
 from typing import TYPE_CHECKING, Any
 from urllib.parse import urljoin
+from xml.parsers import expat
 
 import lxml.etree
 
@@ -21,32 +25,216 @@ class Sitemap:
     (type=sitemapindex) files"""
 
     def __init__(self, xmltext: str | bytes):
-        xmlp = lxml.etree.XMLParser(
-            recover=True, remove_comments=True, resolve_entities=False
+        self._body: bytes
+        self._encoding: str | None
+        if isinstance(xmltext, str):
+            self._body, self._encoding = xmltext.encode("utf-8"), "utf-8"
+        else:
+            self._body, self._encoding = xmltext, None
+        self._events: Iterator[tuple[str, Any]] | None = self._iterparse()
+        self.type = ""
+        # the first event is the start of the root element
+        for _, root in self._events:
+            rt = root.tag
+            assert isinstance(rt, str)
+            self.type = rt.rpartition("}")[2]
+            break
+
+    def _iterparse(self) -> Iterator[tuple[str, Any]]:
+        # The document is parsed incrementally, and entries are dropped from
+        # the tree once read, so that the whole tree is never kept in memory.
+        return lxml.etree.iterparse(
+            BytesIO(self._body),
+            events=("start", "end"),
+            encoding=self._encoding,
+            recover=True,
+            remove_comments=True,
+            resolve_entities=False,
         )
-        self._root = lxml.etree.fromstring(xmltext, parser=xmlp)
-        rt = self._root.tag
-        assert isinstance(rt, str)
-        self.type = rt.split("}", 1)[1] if "}" in rt else rt
 
     def __iter__(self) -> Iterator[dict[str, Any]]:
-        for elem in self._root.getchildren():
+        events = self._events
+        self._events = None
+        if events is None:  # iterated before, parse the document again
+            events = self._iterparse()
+            next(events, None)
+        # tag names without their namespace, computed once per distinct tag
+        names: dict[Any, str] = {}
+        depth = 1  # inside the root element
+        for event, elem in events:
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth != 1:  # not an entry, i.e. a child of the root element
+                continue
             d: dict[str, Any] = {}
-            for el in elem.getchildren():
+            for el in elem:
                 tag = el.tag
-                assert isinstance(tag, str)
-                name = tag.split("}", 1)[1] if "}" in tag else tag
+                name = names.get(tag)
+                if name is None:
+                    assert isinstance(tag, str)
+                    name = names[tag] = tag.rpartition("}")[2]
 
                 if name == "link":
-                    if "href" in el.attrib:
-                        d.setdefault("alternate", []).append(el.get("href"))
+                    href = el.get("href")
+                    if href is not None:
+                        d.setdefault("alternate", []).append(href)
                 else:
-                    d[name] = el.text.strip() if el.text else ""
+                    text = el.text
+                    d[name] = text.strip() if text else ""
+
+            elem.clear()
+            parent = elem.getparent()
+            while elem.getprevious() is not None:
+                del parent[0]
 
             if "loc" in d:
                 yield d
 
 
+class _ExpatSitemap:
+    """Like :class:`Sitemap`, but parses the document with
+    :mod:`xml.parsers.expat` instead of lxml, see :setting:`SITEMAP_PARSER`.
+
+    Unlike :class:`Sitemap`, it does not recover from malformed documents:
+    :exc:`xml.parsers.expat.ExpatError` is raised once the parser reaches the
+    error, after yielding the entries that precede it.
+    """
+
+    _chunk_size = 65536
+
+    def __init__(self, xmltext: str | bytes):
+        self._body: bytes
+        self._encoding: str | None
+        if isinstance(xmltext, str):
+            self._body, self._encoding = xmltext.encode("utf-8"), "utf-8"
+        else:
+            self._body, self._encoding = xmltext, None
+        # lxml ignores blank lines before the XML declaration, expat does not
+        self._body = self._body.lstrip()
+        self.type = ""
+        # getting the first entry also parses the start of the root element,
+        # which sets self.type
+        self._entries: Iterator[dict[str, Any]] | None = self._peek(self._parse())
+
+    @staticmethod
+    def _peek(entries: Iterator[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        first = next(entries, None)
+        if first is None:
+            return iter(())
+        return chain((first,), entries)
+
+    def _parse(self) -> Iterator[dict[str, Any]]:
+        # The parse state lives in a handler created for each parse, so that
+        # iterating the sitemap again while a parse is ongoing is safe.
+        handler = _ExpatSitemapHandler(self)
+        parser = expat.ParserCreate(self._encoding, namespace_separator="}")
+        parser.buffer_text = True
+        # Setting a default handler disables the expansion of internal
+        # entities, like resolve_entities=False does for lxml. External
+        # entities are never loaded, as no ExternalEntityRefHandler is set.
+        parser.DefaultHandler = handler.default
+        parser.StartElementHandler = handler.start
+        parser.EndElementHandler = handler.end
+        parser.CharacterDataHandler = handler.characters
+        parsed = handler.parsed
+        view = memoryview(self._body)
+        try:
+            for start in range(0, len(view), self._chunk_size):
+                parser.Parse(view[start : start + self._chunk_size], False)
+                yield from parsed
+                parsed.clear()
+            parser.Parse(b"", True)
+        except expat.ExpatError:
+            # yield the entries parsed before the error first
+            yield from parsed
+            raise
+        yield from parsed
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        entries = self._entries
+        self._entries = None
+        if entries is None:  # iterated before, parse the document again
+            entries = self._parse()
+        return entries
+
+
+class _ExpatSitemapHandler:
+    """The expat handlers of a single parse of an :class:`_ExpatSitemap`."""
+
+    def __init__(self, sitemap: _ExpatSitemap):
+        self.sitemap = sitemap
+        self.depth = 0
+        self.entry: dict[str, Any] = {}
+        self.name: str | None = None  # of the entry field whose text is read
+        self.text: list[str] = []
+        self.names: dict[str, str] = {}
+        self.parsed: list[dict[str, Any]] = []
+
+    def start(self, tag: str, attrs: dict[str, str]) -> None:
+        self.depth += 1
+        depth = self.depth
+        if depth == 3:  # a field of an entry
+            name = self.names.get(tag)
+            if name is None:
+                name = self.names[tag] = tag.rpartition("}")[2]
+            if name == "link":
+                href = attrs.get("href")
+                if href is not None:
+                    self.entry.setdefault("alternate", []).append(href)
+            else:
+                self.name = name
+                self.text.clear()
+        elif depth == 2:  # an entry
+            self.entry = {}
+        elif depth == 1:
+            self.sitemap.type = tag.rpartition("}")[2]
+        else:
+            self.read_text_end()
+
+    def end(self, tag: str) -> None:
+        depth = self.depth
+        self.depth -= 1
+        if depth == 3:
+            self.read_text_end()
+        elif depth == 2 and "loc" in self.entry:
+            self.parsed.append(self.entry)
+
+    def characters(self, data: str) -> None:
+        if self.name is not None:
+            self.text.append(data)
+
+    def default(self, data: str) -> None:
+        if data.startswith("&"):  # an entity reference that is not expanded
+            self.read_text_end()
+
+    def read_text_end(self) -> None:
+        # Like lxml's Element.text, the text of a field ends at its first
+        # child element or entity reference.
+        if self.name is not None:
+            self.entry[self.name] = "".join(self.text).strip()
+            self.name = None
+
+
+def parse_lastmod(lastmod: str) -> datetime:
+    """Return the date of the given ``lastmod`` value of a sitemap entry as a
+    naive :class:`~datetime.datetime`.
+
+    Only the date part of the value is parsed, any time and time zone
+    information is ignored. The month and day may be omitted (``YYYY``,
+    ``YYYY-MM``), as W3C Datetime allows, in which case they default to 1.
+    The basic ISO 8601 format (e.g. ``YYYYMMDD``), which W3C Datetime does not
+    allow, is not supported.
+    """
+    date = lastmod[:10]
+    if len(date) == 4:
+        date += "-01-01"
+    elif len(date) == 7:
+        date += "-01"
+    return datetime.fromisoformat(date)
+
+
 def sitemap_urls_from_robots(
     robots_text: str, base_url: str | None = None
 ) -> Iterable[str]:
@@ -54,6 +242,7 @@ def sitemap_urls_from_robots(
     robots.txt file
     """
     for line in robots_text.splitlines():
-        if line.lstrip().lower().startswith("sitemap:"):
-            url = line.split(":", 1)[1].strip()
-            yield urljoin(base_url or "", url)
+        line = line.lstrip()
+        # lower() only the part that is compared, not the whole line
+        if line[:8].lower() == "sitemap:":
+            yield urljoin(base_url or "", line[8:].strip())
@@ -68,7 +68,7 @@ class AsyncDefAsyncioPipeline:
         loop = asyncio.get_event_loop()
         loop.call_later(0, d.callback, None)
         await deferred_to_future(d)
-        await asyncio.sleep(0.2)
+        await asyncio.sleep(0)
         item["pipeline_passed"] = await get_from_asyncio_queue(True)
         return item
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import cache
 from typing import Any
 from unittest import mock
 
@@ -20,8 +21,14 @@ from tests.utils.decorators import coroutine_test, inline_callbacks_test
 class TestSpider:
     spider_class = Spider
 
+    @classmethod
+    @cache
+    def _plain_spider(cls) -> Spider:
+        """A spider shared by the tests that do not modify it."""
+        return cls.spider_class("example.com")
+
     def test_base_spider(self):
-        spider = self.spider_class("example.com")
+        spider = self._plain_spider()
         assert spider.name == "example.com"
         assert spider.start_urls == []  # pylint: disable=use-implicit-booleaness-not-comparison
 
@@ -47,11 +54,15 @@ class TestSpider:
         assert spider.settings is crawler.settings
 
     def test_from_crawler_init_call(self):
-        with mock.patch.object(
-            self.spider_class, "__init__", return_value=None
-        ) as mock_init:
-            self.spider_class.from_crawler(get_crawler(), "example.com", foo="bar")
-            mock_init.assert_called_once_with("example.com", foo="bar")
+        init_calls = []
+
+        class InitRecordingSpider(self.spider_class):
+            def __init__(self, *args, **kwargs):
+                init_calls.append((args, kwargs))
+                super().__init__(*args, **kwargs)
+
+        InitRecordingSpider.from_crawler(get_crawler(), "example.com", foo="bar")
+        assert init_calls == [(("example.com",), {"foo": "bar"})]
 
     def test_closed_signal_call(self):
         class TestSpider(self.spider_class):
@@ -106,7 +117,7 @@ class TestSpider:
         assert crawler.settings.get("TEST1") == "spider_instance"
 
     def test_logger(self):
-        spider = self.spider_class("example.com")
+        spider = self._plain_spider()
         with LogCapture() as lc:
             spider.logger.info("test log msg")
         lc.check(("example.com", "INFO", "test log msg"))
@@ -116,7 +127,7 @@ class TestSpider:
         assert record.spider is spider
 
     def test_log(self):
-        spider = self.spider_class("example.com")
+        spider = self._plain_spider()
         with mock.patch("scrapy.spiders.Spider.logger") as mock_logger:
             spider.log("test log msg", "INFO")
         mock_logger.log.assert_called_once_with("INFO", "test log msg")
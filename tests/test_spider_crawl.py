@@ -4,15 +4,17 @@ import re
 import warnings
 from logging import ERROR
 
+import pytest
 from testfixtures import LogCapture
 from w3lib.url import safe_url_string
 
 from scrapy.http import HtmlResponse, Request, TextResponse
 from scrapy.linkextractors import LinkExtractor
 from scrapy.spiders import CrawlSpider, Rule, Spider
+from scrapy.utils.request import request_from_dict
 from scrapy.utils.test import get_crawler
 from tests.test_spider import TestSpider
-from tests.utils.decorators import inline_callbacks_test
+from tests.utils.decorators import coroutine_test, inline_callbacks_test
 
 
 class TestCrawlSpider(TestSpider):
@@ -47,6 +49,30 @@ class TestCrawlSpider(TestSpider):
             "http://example.org/about.html",
             "http://example.org/nofollow.html",
         ]
+        assert all(r.callback == spider._callback for r in output)
+        assert all(r.errback == spider._errback for r in output)
+
+    def test_rule_request_to_dict(self):
+        response = HtmlResponse(
+            "http://example.org/somepage/index.html", body=self.test_body
+        )
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            allowed_domains = ["example.org"]
+            rules = (Rule(),)
+
+        spider = _CrawlSpider()
+        request = next(iter(spider._requests_to_follow(response)))
+        assert request is not None
+        d = request.to_dict(spider=spider)
+        assert d["callback"] == "_callback"
+        assert d["errback"] == "_errback"
+        request2 = request_from_dict(d, spider=spider)
+        assert request2.url == request.url
+        assert request2.callback == spider._callback
+        assert request2.errback == spider._errback
+        assert request2.meta == request.meta
 
     def test_process_links(self):
         response = HtmlResponse(
@@ -117,6 +143,162 @@ class TestCrawlSpider(TestSpider):
             "http://example.org/nofollow.html",
         ]
 
+    def test_links_followed_once_across_rules(self):
+        response = HtmlResponse(
+            "http://example.org/somepage/index.html", body=self.test_body
+        )
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            allowed_domains = ["example.org"]
+            rules = (
+                Rule(LinkExtractor(allow=r"/about\.html")),
+                Rule(LinkExtractor()),
+            )
+
+        spider = _CrawlSpider()
+        output = list(spider._requests_to_follow(response))
+        assert [(r.url, r.meta["rule"]) for r in output] == [
+            ("http://example.org/about.html", 0),
+            ("http://example.org/somepage/item/12.html", 1),
+            ("http://example.org/nofollow.html", 1),
+        ]
+
+    def test_links_deduplicated_by_url_across_rules(self):
+        body = b"""<html><body>
+        <div id="a"><a href="/about.html">About us</a></div>
+        <div id="b"><a href="/about.html">More about us</a></div>
+        </body></html>"""
+        response = HtmlResponse("http://example.org/index.html", body=body)
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            rules = (
+                Rule(LinkExtractor(restrict_xpaths="//div[@id='a']")),
+                Rule(LinkExtractor(restrict_xpaths="//div[@id='b']")),
+            )
+
+        spider = _CrawlSpider()
+        output = list(spider._requests_to_follow(response))
+        assert [(r.url, r.meta["link_text"]) for r in output] == [
+            ("http://example.org/about.html", "About us"),
+        ]
+
+    def test_shared_link_extractor_extracts_once(self):
+        response = HtmlResponse(
+            "http://example.org/somepage/index.html", body=self.test_body
+        )
+        calls = []
+
+        class _LinkExtractor(LinkExtractor):
+            def extract_links(self, response):
+                calls.append(response)
+                return super().extract_links(response)
+
+        link_extractor = _LinkExtractor()
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            allowed_domains = ["example.org"]
+            rules = (
+                Rule(link_extractor, process_links="only_about"),
+                Rule(link_extractor),
+            )
+
+            def only_about(self, links):
+                return [link for link in links if "about" in link.url]
+
+        spider = _CrawlSpider()
+        output = list(spider._requests_to_follow(response))
+        assert calls == [response]
+        assert [(r.url, r.meta["rule"]) for r in output] == [
+            ("http://example.org/about.html", 0),
+            ("http://example.org/somepage/item/12.html", 1),
+            ("http://example.org/nofollow.html", 1),
+        ]
+
+    def test_shared_link_extractor_process_links_in_place(self):
+        body = b"""<html><body>
+        <a href="/keep">Keep</a>
+        <a href="/other">Other</a>
+        </body></html>"""
+        response = HtmlResponse("http://example.org/index.html", body=body)
+        link_extractor = LinkExtractor()
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            rules = (
+                Rule(link_extractor, process_links="fix"),
+                Rule(link_extractor),
+            )
+
+            def fix(self, links):
+                for link in links:
+                    link.url += "?x=1"
+                return [link for link in links if "/keep" in link.url]
+
+        spider = _CrawlSpider()
+        output = list(spider._requests_to_follow(response))
+        assert [(r.url, r.meta["rule"]) for r in output] == [
+            ("http://example.org/keep?x=1", 0),
+            ("http://example.org/keep", 1),
+            ("http://example.org/other", 1),
+        ]
+
+    def test_link_cache(self):
+        calls = []
+
+        class _LinkExtractor(LinkExtractor):
+            def extract_links(self, response):
+                calls.append(response)
+                return super().extract_links(response)
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            allowed_domains = ["example.org"]
+            rules = (Rule(_LinkExtractor()),)
+
+        url = "http://example.org/somepage/index.html"
+        response1 = HtmlResponse(url, body=self.test_body)
+        response2 = HtmlResponse(url, body=self.test_body)
+        response3 = HtmlResponse(url, body=self.test_body + b"<a href='/new'></a>")
+
+        crawler = get_crawler(settings_dict={"CRAWLSPIDER_LINK_CACHE_SIZE": 1})
+        spider = _CrawlSpider.from_crawler(crawler)
+        output1 = list(spider._requests_to_follow(response1))
+        output2 = list(spider._requests_to_follow(response2))
+        assert calls == [response1]
+        assert [r.url for r in output1] == [r.url for r in output2]
+        list(spider._requests_to_follow(response3))
+        list(spider._requests_to_follow(response1))
+        assert calls == [response1, response3, response1]
+
+        crawler = get_crawler()
+        spider = _CrawlSpider.from_crawler(crawler)
+        calls.clear()
+        list(spider._requests_to_follow(response1))
+        list(spider._requests_to_follow(response2))
+        assert calls == [response1, response2]
+
+    def test_link_cache_process_links_in_place(self):
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            allowed_domains = ["example.org"]
+            rules = (Rule(LinkExtractor(allow=r"/about\.html"), process_links="fix"),)
+
+            def fix(self, links):
+                for link in links:
+                    link.url += "?x=1"
+                return links
+
+        url = "http://example.org/somepage/index.html"
+        crawler = get_crawler(settings_dict={"CRAWLSPIDER_LINK_CACHE_SIZE": 1})
+        spider = _CrawlSpider.from_crawler(crawler)
+        for _ in range(2):
+            response = HtmlResponse(url, body=self.test_body)
+            output = list(spider._requests_to_follow(response))
+            assert [r.url for r in output] == ["http://example.org/about.html?x=1"]
+
     def test_process_request(self):
         response = HtmlResponse(
             "http://example.org/somepage/index.html", body=self.test_body
@@ -232,6 +414,148 @@ class TestCrawlSpider(TestSpider):
             "HtmlResponse",
         ]
 
+    def test_requests_to_follow_non_html(self):
+        response = TextResponse(
+            "http://example.org/somepage/index.html", body=self.test_body
+        )
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            rules = (Rule(),)
+
+        spider = _CrawlSpider()
+        assert list(spider._requests_to_follow(response)) == []
+
+    @coroutine_test
+    async def test_parse_with_rules_async_generator_streaming(self):
+        produced = []
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            _follow_links = False
+
+            async def parse_start_url(self, response):
+                for i in range(2):
+                    produced.append(i)
+                    yield {"i": i}
+
+        spider = _CrawlSpider()
+        response = HtmlResponse("http://example.org", body=self.test_body)
+        results = spider.parse_with_rules(response, spider.parse_start_url, {})
+        assert await results.__anext__() == {"i": 0}
+        assert produced == [0]
+        assert [item async for item in results] == [{"i": 1}]
+
+    @coroutine_test
+    async def test_parse_with_rules_async_generator_process_results(self):
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            _follow_links = False
+
+            async def parse_start_url(self, response):
+                for i in range(2):
+                    yield {"i": i}
+
+            def process_results(self, response, results):
+                return [{"count": len(results)}]
+
+        spider = _CrawlSpider()
+        response = HtmlResponse("http://example.org", body=self.test_body)
+        results = spider.parse_with_rules(response, spider.parse_start_url, {})
+        assert [item async for item in results] == [{"count": 2}]
+
+    @coroutine_test
+    async def test_rule_cb_kwargs(self):
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            _follow_links = False
+            rules = (
+                Rule(
+                    LinkExtractor(allow=r"/about\.html"),
+                    callback="parse_item",
+                    cb_kwargs={"a": 1, "b": 2},
+                ),
+                Rule(callback="parse_item"),
+            )
+
+            def parse_item(self, response, **kwargs):
+                yield kwargs
+
+        spider = _CrawlSpider()
+        response = HtmlResponse(
+            "http://example.org/somepage/index.html", body=self.test_body
+        )
+        about, item, _ = spider._requests_to_follow(response)
+        assert about is not None
+        assert item is not None
+        about_response = HtmlResponse(about.url, request=about)
+        results = spider._callback(about_response, b=3)
+        assert [r async for r in results] == [{"a": 1, "b": 3}]
+        item_response = HtmlResponse(item.url, request=item)
+        results = spider._callback(item_response, c=4)
+        assert [r async for r in results] == [{"c": 4}]
+
+    def test_rules_compiled_per_spider(self):
+        class _Rule(Rule):
+            def __init__(self, *args, priority=0, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.priority = priority
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            rules = (_Rule(callback="parse_item", priority=1),)
+
+            def parse_item(self, response):
+                pass
+
+        spider1 = _CrawlSpider()
+        spider2 = _CrawlSpider()
+        rule = _CrawlSpider.rules[0]
+        assert rule.callback == "parse_item"
+        for spider in (spider1, spider2):
+            compiled_rule = spider._rules[0]
+            assert compiled_rule is not rule
+            assert isinstance(compiled_rule, _Rule)
+            assert compiled_rule.priority == 1
+            assert compiled_rule.callback == spider.parse_item
+            assert compiled_rule.link_extractor is rule.link_extractor
+
+    @pytest.mark.parametrize("rule_attr", ["process_links", "process_request"])
+    def test_rule_method_missing(self, rule_attr):
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            rules = (Rule(**{rule_attr: "missing_method"}),)
+
+        with pytest.raises(TypeError, match=f"Rule.{rule_attr} .*'missing_method'"):
+            _CrawlSpider()
+
+    def test_rules_compiled_per_spider_slots(self):
+        class _Rule(Rule):
+            __slots__ = ("priority",)
+
+            def __init__(self, *args, priority=0, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.priority = priority
+
+        plain_rule = Rule(callback="parse_item")
+        plain_rule.custom = "value"
+
+        class _CrawlSpider(self.spider_class):
+            name = "test"
+            rules = (_Rule(callback="parse_item", priority=1), plain_rule)
+
+            def parse_item(self, response):
+                pass
+
+        spider = _CrawlSpider()
+        slot_rule, compiled_plain_rule = spider._rules
+        assert slot_rule.priority == 1
+        assert slot_rule.callback == spider.parse_item
+        assert compiled_plain_rule is not plain_rule
+        assert compiled_plain_rule.custom == "value"
+        assert compiled_plain_rule.callback == spider.parse_item
+        assert plain_rule.callback == "parse_item"
+
     def test_follow_links_attribute_population(self):
         crawler = get_crawler()
         spider = self.spider_class.from_crawler(crawler, "example.com")
@@ -262,13 +586,16 @@ class TestCrawlSpider(TestSpider):
             start_urls = "https://www.example.com"
             _follow_links = False
 
-        with warnings.catch_warnings(record=True) as w:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
             spider = _CrawlSpider()
-            assert len(w) == 0
+        with pytest.warns(
+            UserWarning, match="_parse_response method is deprecated"
+        ) as record:
             spider._parse_response(
                 TextResponse(spider.start_urls, body=b""), None, None
             )
-            assert len(w) == 1
+        assert len(record) == 1
 
     def test_parse_response_override(self):
         class _CrawlSpider(CrawlSpider):
@@ -279,26 +606,28 @@ class TestCrawlSpider(TestSpider):
             start_urls = "https://www.example.com"
             _follow_links = False
 
-        with warnings.catch_warnings(record=True) as w:
-            assert len(w) == 0
+        with pytest.warns(
+            UserWarning, match="class overrides, is deprecated"
+        ) as record:
             spider = _CrawlSpider()
-            assert len(w) == 1
+        assert len(record) == 1
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
             spider._parse_response(
                 TextResponse(spider.start_urls, body=b""), None, None
             )
-            assert len(w) == 1
 
     def test_parse_with_rules(self):
         class _CrawlSpider(CrawlSpider):
             name = "test"
             start_urls = "https://www.example.com"
 
-        with warnings.catch_warnings(record=True) as w:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
             spider = _CrawlSpider()
             spider.parse_with_rules(
                 TextResponse(spider.start_urls, body=b""), None, None
             )
-            assert len(w) == 0
 
 
 class TestDeprecation:
@@ -2,16 +2,14 @@ from __future__ import annotations
 
 import gzip
 import warnings
-from datetime import datetime
-from io import BytesIO
 from logging import WARNING
 from pathlib import Path
 
 import pytest
-from testfixtures import LogCapture
 
 from scrapy.http import HtmlResponse, Request, Response, TextResponse, XmlResponse
 from scrapy.spiders import SitemapSpider
+from scrapy.utils.sitemap import _ExpatSitemap, parse_lastmod
 from scrapy.utils.test import get_crawler
 from tests import tests_datadir
 from tests.test_spider import TestSpider
@@ -22,53 +20,93 @@ class TestSitemapSpider(TestSpider):
     spider_class = SitemapSpider
 
     BODY = b"SITEMAP"
-    f = BytesIO()
-    g = gzip.GzipFile(fileobj=f, mode="w+b")
-    g.write(BODY)
-    g.close()
-    GZBODY = f.getvalue()
+    GZBODY = gzip.compress(BODY)
 
-    def assertSitemapBody(self, response: Response, body: bytes | None) -> None:
+    @pytest.fixture(scope="class")
+    def sitemap_spider(self) -> SitemapSpider:
         crawler = get_crawler()
-        spider = self.spider_class.from_crawler(crawler, "example.com")
+        return self.spider_class.from_crawler(crawler, "example.com")
+
+    @pytest.fixture(scope="class")
+    def bomb_body(self) -> bytes:
+        return Path(tests_datadir, "compressed", "bomb-gzip.bin").read_bytes()
+
+    @staticmethod
+    def assertSitemapBody(
+        spider: SitemapSpider, response: Response, body: bytes | None
+    ) -> None:
         assert spider._get_sitemap_body(response) == body
 
-    def test_get_sitemap_body(self):
-        r = XmlResponse(url="http://www.example.com/", body=self.BODY)
-        self.assertSitemapBody(r, self.BODY)
+    def test_get_sitemap_body(self, sitemap_spider: SitemapSpider) -> None:
+        r: Response = XmlResponse(url="http://www.example.com/", body=self.BODY)
+        self.assertSitemapBody(sitemap_spider, r, self.BODY)
 
         r = HtmlResponse(url="http://www.example.com/", body=self.BODY)
-        self.assertSitemapBody(r, None)
+        self.assertSitemapBody(sitemap_spider, r, None)
 
         r = Response(url="http://www.example.com/favicon.ico", body=self.BODY)
-        self.assertSitemapBody(r, None)
+        self.assertSitemapBody(sitemap_spider, r, None)
 
-    def test_get_sitemap_body_gzip_headers(self):
+    def test_get_sitemap_body_gzip_headers(self, sitemap_spider: SitemapSpider) -> None:
         r = Response(
             url="http://www.example.com/sitemap",
             body=self.GZBODY,
             headers={"content-type": "application/gzip"},
             request=Request("http://www.example.com/sitemap"),
         )
-        self.assertSitemapBody(r, self.BODY)
+        self.assertSitemapBody(sitemap_spider, r, self.BODY)
 
-    def test_get_sitemap_body_xml_url(self):
+    def test_get_sitemap_body_xml_url(self, sitemap_spider: SitemapSpider) -> None:
         r = TextResponse(url="http://www.example.com/sitemap.xml", body=self.BODY)
-        self.assertSitemapBody(r, self.BODY)
+        self.assertSitemapBody(sitemap_spider, r, self.BODY)
 
-    def test_get_sitemap_body_xml_url_compressed(self):
+    def test_get_sitemap_body_xml_url_compressed(
+        self, sitemap_spider: SitemapSpider
+    ) -> None:
         r = Response(
             url="http://www.example.com/sitemap.xml.gz",
             body=self.GZBODY,
             request=Request("http://www.example.com/sitemap"),
         )
-        self.assertSitemapBody(r, self.BODY)
+        self.assertSitemapBody(sitemap_spider, r, self.BODY)
 
         # .xml.gz but body decoded by HttpCompression middleware already
         r = Response(url="http://www.example.com/sitemap.xml.gz", body=self.BODY)
-        self.assertSitemapBody(r, self.BODY)
-
-    def test_get_sitemap_urls_from_robotstxt(self):
+        self.assertSitemapBody(sitemap_spider, r, self.BODY)
+
+    def test_get_sitemap_body_truncated_gzip(self, sitemap_spider: SitemapSpider):
+        sitemap = (
+            b'<?xml version="1.0" encoding="UTF-8"?>\n'
+            b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            + b"".join(
+                b"<url><loc>http://www.example.com/%d</loc></url>\n" % i
+                for i in range(1000)
+            )
+            + b"</urlset>"
+        )
+        gzipped = gzip.compress(sitemap, mtime=0)
+        # cut the body where its last 4 bytes, read as the ISIZE field of a
+        # gzip trailer, exceed the default DOWNLOAD_MAXSIZE
+        cut = next(
+            i
+            for i in range(len(gzipped) // 2, len(gzipped))
+            if int.from_bytes(gzipped[i - 4 : i], "little") > sitemap_spider._max_size
+        )
+        r = Response(
+            url="http://www.example.com/sitemap.xml.gz",
+            body=gzipped[:cut],
+            request=Request("http://www.example.com/sitemap.xml.gz"),
+        )
+        body = sitemap_spider._get_sitemap_body(r)
+        assert body
+        assert sitemap.startswith(body)
+        requests = list(sitemap_spider._parse_sitemap(r))
+        assert requests
+        assert requests[0].url == "http://www.example.com/0"
+
+    def test_get_sitemap_urls_from_robotstxt(
+        self, sitemap_spider: SitemapSpider
+    ) -> None:
         robots = b"""# Sitemap files
 Sitemap: http://example.com/sitemap.xml
 Sitemap: http://example.com/sitemap-product-index.xml
@@ -77,14 +115,33 @@ Sitemap: /sitemap-relative-url.xml
 """
 
         r = TextResponse(url="http://www.example.com/robots.txt", body=robots)
-        spider = self.spider_class("example.com")
-        assert [req.url for req in spider._parse_sitemap(r)] == [
+        assert [req.url for req in sitemap_spider._parse_sitemap(r)] == [
             "http://example.com/sitemap.xml",
             "http://example.com/sitemap-product-index.xml",
             "http://example.com/sitemap-uppercase.xml",
             "http://www.example.com/sitemap-relative-url.xml",
         ]
 
+    def test_get_sitemap_urls_from_robotstxt_bom(self):
+        robots = b"\xef\xbb\xbfSitemap: http://example.com/sitemap.xml\n"
+        r = TextResponse(url="http://www.example.com/robots.txt", body=robots)
+        spider = self.spider_class("example.com")
+        assert [req.url for req in spider._parse_sitemap(r)] == [
+            "http://example.com/sitemap.xml"
+        ]
+
+    def test_get_sitemap_urls_from_robotstxt_charset(self):
+        robots = "Sitemap: http://example.com/caf\u00e9.xml\n".encode("iso-8859-1")
+        r = TextResponse(
+            url="http://www.example.com/robots.txt",
+            body=robots,
+            headers={"Content-Type": "text/plain; charset=iso-8859-1"},
+        )
+        spider = self.spider_class("example.com")
+        assert [req.url for req in spider._parse_sitemap(r)] == [
+            "http://example.com/caf%C3%A9.xml"
+        ]
+
     def test_alternate_url_locs(self):
         sitemap = b"""<?xml version="1.0" encoding="UTF-8"?>
     <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
@@ -114,7 +171,7 @@ Sitemap: /sitemap-relative-url.xml
             "http://www.example.com/italiano/",
         ]
 
-    def test_sitemap_filter(self):
+    def test_sitemap_filter(self, sitemap_spider):
         sitemap = b"""<?xml version="1.0" encoding="UTF-8"?>
     <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
         xmlns:xhtml="http://www.w3.org/1999/xhtml">
@@ -131,13 +188,12 @@ Sitemap: /sitemap-relative-url.xml
         class FilteredSitemapSpider(self.spider_class):
             def sitemap_filter(self, entries):
                 for entry in entries:
-                    date_time = datetime.strptime(entry["lastmod"], "%Y-%m-%d")
+                    date_time = parse_lastmod(entry["lastmod"])
                     if date_time.year > 2008:
                         yield entry
 
         r = TextResponse(url="http://www.example.com/sitemap.xml", body=sitemap)
-        spider = self.spider_class("example.com")
-        assert [req.url for req in spider._parse_sitemap(r)] == [
+        assert [req.url for req in sitemap_spider._parse_sitemap(r)] == [
             "http://www.example.com/english/",
             "http://www.example.com/portuguese/",
         ]
@@ -147,7 +203,7 @@ Sitemap: /sitemap-relative-url.xml
             "http://www.example.com/english/"
         ]
 
-    def test_sitemap_filter_with_alternate_links(self):
+    def test_sitemap_filter_with_alternate_links(self, sitemap_spider):
         sitemap = b"""<?xml version="1.0" encoding="UTF-8"?>
     <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
         xmlns:xhtml="http://www.w3.org/1999/xhtml">
@@ -173,8 +229,7 @@ Sitemap: /sitemap-relative-url.xml
                             yield entry
 
         r = TextResponse(url="http://www.example.com/sitemap.xml", body=sitemap)
-        spider = self.spider_class("example.com")
-        assert [req.url for req in spider._parse_sitemap(r)] == [
+        assert [req.url for req in sitemap_spider._parse_sitemap(r)] == [
             "http://www.example.com/english/article_1/",
             "http://www.example.com/english/article_2/",
         ]
@@ -184,7 +239,7 @@ Sitemap: /sitemap-relative-url.xml
             "http://www.example.com/deutsch/article_1/"
         ]
 
-    def test_sitemapindex_filter(self):
+    def test_sitemapindex_filter(self, sitemap_spider):
         sitemap = b"""<?xml version="1.0" encoding="UTF-8"?>
     <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
         <sitemap>
@@ -200,15 +255,12 @@ Sitemap: /sitemap-relative-url.xml
         class FilteredSitemapSpider(self.spider_class):
             def sitemap_filter(self, entries):
                 for entry in entries:
-                    date_time = datetime.strptime(
-                        entry["lastmod"].split("T")[0], "%Y-%m-%d"
-                    )
+                    date_time = parse_lastmod(entry["lastmod"])
                     if date_time.year > 2004:
                         yield entry
 
         r = TextResponse(url="http://www.example.com/sitemap.xml", body=sitemap)
-        spider = self.spider_class("example.com")
-        assert [req.url for req in spider._parse_sitemap(r)] == [
+        assert [req.url for req in sitemap_spider._parse_sitemap(r)] == [
             "http://www.example.com/sitemap1.xml",
             "http://www.example.com/sitemap2.xml",
         ]
@@ -218,117 +270,138 @@ Sitemap: /sitemap-relative-url.xml
             "http://www.example.com/sitemap2.xml"
         ]
 
-    def test_compression_bomb_setting(self):
+    def test_sitemap_parser_setting(self) -> None:
+        sitemap = b"""<?xml version="1.0" encoding="UTF-8"?>
+    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+        <url><loc>http://www.example.com/english/</loc></url>
+    </urlset>"""
+        r = TextResponse(url="http://www.example.com/sitemap.xml", body=sitemap)
+        crawler = get_crawler(settings_dict={"SITEMAP_PARSER": "expat"})
+        spider = self.spider_class.from_crawler(crawler, "example.com")
+        assert spider._sitemap_class is _ExpatSitemap
+        assert [req.url for req in spider._parse_sitemap(r)] == [
+            "http://www.example.com/english/"
+        ]
+
+    def test_sitemap_parser_setting_invalid(self) -> None:
+        crawler = get_crawler(settings_dict={"SITEMAP_PARSER": "foo"})
+        with pytest.raises(ValueError, match="Unsupported SITEMAP_PARSER value"):
+            self.spider_class.from_crawler(crawler, "example.com")
+
+    def test_compression_bomb_setting(self, bomb_body: bytes) -> None:
         settings = {"DOWNLOAD_MAXSIZE": 10_000_000}
         crawler = get_crawler(settings_dict=settings)
         spider = self.spider_class.from_crawler(crawler, "example.com")
-        body_path = Path(tests_datadir, "compressed", "bomb-gzip.bin")
-        body = body_path.read_bytes()
         request = Request(url="https://example.com")
-        response = Response(url="https://example.com", body=body, request=request)
+        response = Response(url="https://example.com", body=bomb_body, request=request)
         assert spider._get_sitemap_body(response) is None
 
     @pytest.mark.filterwarnings("ignore::scrapy.exceptions.ScrapyDeprecationWarning")
-    def test_compression_bomb_spider_attr(self):
+    def test_compression_bomb_spider_attr(self, bomb_body):
         class DownloadMaxSizeSpider(self.spider_class):
             download_maxsize = 10_000_000
 
         crawler = get_crawler()
         spider = DownloadMaxSizeSpider.from_crawler(crawler, "example.com")
-        body_path = Path(tests_datadir, "compressed", "bomb-gzip.bin")
-        body = body_path.read_bytes()
         request = Request(url="https://example.com")
-        response = Response(url="https://example.com", body=body, request=request)
+        response = Response(url="https://example.com", body=bomb_body, request=request)
         assert spider._get_sitemap_body(response) is None
 
-    def test_compression_bomb_request_meta(self):
-        crawler = get_crawler()
-        spider = self.spider_class.from_crawler(crawler, "example.com")
-        body_path = Path(tests_datadir, "compressed", "bomb-gzip.bin")
-        body = body_path.read_bytes()
+    def test_compression_bomb_request_meta(
+        self, sitemap_spider: SitemapSpider, bomb_body: bytes
+    ) -> None:
         request = Request(
             url="https://example.com", meta={"download_maxsize": 10_000_000}
         )
-        response = Response(url="https://example.com", body=body, request=request)
-        assert spider._get_sitemap_body(response) is None
+        response = Response(url="https://example.com", body=bomb_body, request=request)
+        assert sitemap_spider._get_sitemap_body(response) is None
 
-    def test_download_warnsize_setting(self):
+    def test_download_warnsize_setting(
+        self, bomb_body: bytes, caplog: pytest.LogCaptureFixture
+    ) -> None:
         settings = {"DOWNLOAD_WARNSIZE": 10_000_000}
         crawler = get_crawler(settings_dict=settings)
         spider = self.spider_class.from_crawler(crawler, "example.com")
-        body_path = Path(tests_datadir, "compressed", "bomb-gzip.bin")
-        body = body_path.read_bytes()
         request = Request(url="https://example.com")
-        response = Response(url="https://example.com", body=body, request=request)
-        with LogCapture(
-            "scrapy.spiders.sitemap", propagate=False, level=WARNING
-        ) as log:
+        response = Response(url="https://example.com", body=bomb_body, request=request)
+        with caplog.at_level(WARNING, logger="scrapy.spiders.sitemap"):
             spider._get_sitemap_body(response)
-        log.check(
+        assert caplog.record_tuples == [
             (
                 "scrapy.spiders.sitemap",
-                "WARNING",
+                WARNING,
                 (
                     "<200 https://example.com> body size after decompression "
                     "(11511612 B) is larger than the download warning size "
                     "(10000000 B)."
                 ),
             ),
-        )
+        ]
 
     @pytest.mark.filterwarnings("ignore::scrapy.exceptions.ScrapyDeprecationWarning")
-    def test_download_warnsize_spider_attr(self):
+    def test_download_warnsize_spider_attr(self, bomb_body, caplog):
         class DownloadWarnSizeSpider(self.spider_class):
             download_warnsize = 10_000_000
 
         crawler = get_crawler()
         spider = DownloadWarnSizeSpider.from_crawler(crawler, "example.com")
-        body_path = Path(tests_datadir, "compressed", "bomb-gzip.bin")
-        body = body_path.read_bytes()
         request = Request(
             url="https://example.com", meta={"download_warnsize": 10_000_000}
         )
-        response = Response(url="https://example.com", body=body, request=request)
-        with LogCapture(
-            "scrapy.spiders.sitemap", propagate=False, level=WARNING
-        ) as log:
+        response = Response(url="https://example.com", body=bomb_body, request=request)
+        with caplog.at_level(WARNING, logger="scrapy.spiders.sitemap"):
             spider._get_sitemap_body(response)
-        log.check(
+        assert caplog.record_tuples == [
             (
                 "scrapy.spiders.sitemap",
-                "WARNING",
+                WARNING,
                 (
                     "<200 https://example.com> body size after decompression "
                     "(11511612 B) is larger than the download warning size "
                     "(10000000 B)."
                 ),
             ),
-        )
+        ]
 
-    def test_download_warnsize_request_meta(self):
-        crawler = get_crawler()
-        spider = self.spider_class.from_crawler(crawler, "example.com")
-        body_path = Path(tests_datadir, "compressed", "bomb-gzip.bin")
-        body = body_path.read_bytes()
+    def test_download_warnsize_request_meta(
+        self,
+        sitemap_spider: SitemapSpider,
+        bomb_body: bytes,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
         request = Request(
             url="https://example.com", meta={"download_warnsize": 10_000_000}
         )
-        response = Response(url="https://example.com", body=body, request=request)
-        with LogCapture(
-            "scrapy.spiders.sitemap", propagate=False, level=WARNING
-        ) as log:
-            spider._get_sitemap_body(response)
-        log.check(
+        response = Response(url="https://example.com", body=bomb_body, request=request)
+        with caplog.at_level(WARNING, logger="scrapy.spiders.sitemap"):
+            sitemap_spider._get_sitemap_body(response)
+        assert caplog.record_tuples == [
             (
                 "scrapy.spiders.sitemap",
-                "WARNING",
+                WARNING,
                 (
                     "<200 https://example.com> body size after decompression "
                     "(11511612 B) is larger than the download warning size "
                     "(10000000 B)."
                 ),
             ),
-        )
+        ]
+
+    def test_sitemap_urls_start_requests(self):
+        class TestSpider(self.spider_class):
+            name = "test"
+            sitemap_urls = ["https://toscrape.com/sitemap.xml"]
+
+        spider = TestSpider()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            requests = list(spider.start_requests())
+
+        assert len(requests) == 1
+        request = requests[0]
+        assert request.url == "https://toscrape.com/sitemap.xml"
+        assert request.dont_filter is False
+        assert request.callback == spider._parse_sitemap
 
     @coroutine_test
     async def test_sitemap_urls(self):
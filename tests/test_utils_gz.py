@@ -1,16 +1,27 @@
-from gzip import BadGzipFile
+import os
+import zlib
+from gzip import BadGzipFile, compress
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 from w3lib.encoding import html_to_unicode
 
 from scrapy.http import Response
+from scrapy.utils import gz
+from scrapy.utils._compression import _CHUNK_SIZE
 from scrapy.utils.gz import gunzip, gzip_magic_number
 from tests import tests_datadir
 
 SAMPLEDIR = Path(tests_datadir, "compressed")
 
 
+@pytest.fixture(autouse=True, params=["zlib", "isal.isal_zlib"])
+def zlib_backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+    backend = pytest.importorskip(request.param)
+    monkeypatch.setattr("scrapy.utils.gz._zlib", backend)
+
+
 def test_gunzip_basic():
     r1 = Response(
         "http://www.example.com",
@@ -23,6 +34,39 @@ def test_gunzip_basic():
     assert len(r2.body) == 9950
 
 
+def test_gunzip_multiple_members():
+    data = compress(b"foo") + b"\x00\x00" + compress(b"bar")
+    assert gunzip(data) == b"foobar"
+    assert gunzip(data + b"trailing garbage") == b"foobar"
+
+
+def test_gunzip_bounded_input(monkeypatch: pytest.MonkeyPatch):
+    # Feeding the whole remaining input to every decompress() call makes
+    # decompression quadratic, as each call copies the unconsumed input.
+    backend = gz._zlib
+    input_sizes = []
+
+    class RecordingDecompressor:
+        def __init__(self, **kwargs):
+            self._decompressor = backend.decompressobj(**kwargs)
+
+        def decompress(self, data, max_length=0):
+            input_sizes.append(len(data))
+            return self._decompressor.decompress(data, max_length)
+
+        def __getattr__(self, name):
+            return getattr(self._decompressor, name)
+
+    monkeypatch.setattr(
+        gz,
+        "_zlib",
+        SimpleNamespace(decompressobj=RecordingDecompressor, error=backend.error),
+    )
+    data = os.urandom(10 * _CHUNK_SIZE)
+    assert gunzip(compress(data)) == data
+    assert max(input_sizes) <= _CHUNK_SIZE
+
+
 def test_gunzip_truncated():
     text = gunzip((SAMPLEDIR / "truncated-crc-error.gz").read_bytes())
     assert text.endswith(b"</html")
@@ -33,6 +77,27 @@ def test_gunzip_no_gzip_file_raises():
         gunzip((SAMPLEDIR / "feed-sample1.xml").read_bytes())
 
 
+def test_gunzip_invalid_deflate_data_raises():
+    with pytest.raises(zlib.error):
+        gunzip(compress(b"foo")[:10] + b"\xff" * 10)
+
+
+@pytest.mark.parametrize("end", [-8, -4, -1])
+def test_gunzip_empty_truncated_trailer_raises(end: int):
+    with pytest.raises(EOFError):
+        gunzip(compress(b"")[:end])
+
+
+def test_gunzip_empty_corrupted_trailer_raises():
+    data = compress(b"")
+    with pytest.raises(BadGzipFile, match="CRC check failed"):
+        gunzip(data[:-8] + b"\x01" + data[-7:])
+    with pytest.raises(BadGzipFile, match="Incorrect length"):
+        gunzip(data[:-4] + b"\x01" + data[-3:])
+    # once there is data, trailer errors are ignored
+    assert gunzip(compress(b"foo") + data[:-1]) == b"foo"
+
+
 def test_gunzip_truncated_short():
     r1 = Response(
         "http://www.example.com",
@@ -505,6 +505,17 @@ class TestUtilsCsv:
             },
         ]
 
+    def test_csviter_invalid_utf8(self):
+        # binary bodies are decoded as they are read, so the rows before the
+        # invalid part are returned before the error is raised
+        body = b"id\n" + b"1\n" * 100_000 + b"\xff\n"
+        for obj in (body, Response(url="http://example.com/", body=body)):
+            my_iter = csviter(obj)
+            assert next(my_iter) == {"id": "1"}
+            with pytest.raises(UnicodeDecodeError):
+                for _ in my_iter:
+                    pass
+
 
 class TestBodyOrStr:
     bbody = b"utf8-body"
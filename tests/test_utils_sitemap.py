@@ -1,8 +1,25 @@
-from scrapy.utils.sitemap import Sitemap, sitemap_urls_from_robots
+from __future__ import annotations
 
+from datetime import datetime
+from xml.parsers import expat
 
-def test_sitemap():
-    s = Sitemap(
+import pytest
+
+from scrapy.utils.sitemap import (
+    Sitemap,
+    _ExpatSitemap,
+    parse_lastmod,
+    sitemap_urls_from_robots,
+)
+
+
+@pytest.fixture(params=[Sitemap, _ExpatSitemap], ids=["lxml", "expat"])
+def sitemap_cls(request: pytest.FixtureRequest) -> type[Sitemap | _ExpatSitemap]:
+    return request.param
+
+
+def test_sitemap(sitemap_cls: type[Sitemap | _ExpatSitemap]):
+    s = sitemap_cls(
         b"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.google.com/schemas/sitemap/0.84">
 <url>
@@ -36,8 +53,8 @@ def test_sitemap():
     ]
 
 
-def test_sitemap_index():
-    s = Sitemap(
+def test_sitemap_index(sitemap_cls: type[Sitemap | _ExpatSitemap]):
+    s = sitemap_cls(
         b"""<?xml version="1.0" encoding="UTF-8"?>
 <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
 <sitemap>
@@ -63,11 +80,11 @@ def test_sitemap_index():
     ]
 
 
-def test_sitemap_strip():
+def test_sitemap_strip(sitemap_cls: type[Sitemap | _ExpatSitemap]):
     """Assert we can deal with trailing spaces inside <loc> tags - we've
     seen those
     """
-    s = Sitemap(
+    s = sitemap_cls(
         b"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.google.com/schemas/sitemap/0.84">
 <url>
@@ -94,10 +111,10 @@ def test_sitemap_strip():
     ]
 
 
-def test_sitemap_wrong_ns():
+def test_sitemap_wrong_ns(sitemap_cls: type[Sitemap | _ExpatSitemap]):
     """We have seen sitemaps with wrongs ns. Presumably, Google still works
     with these, though is not 100% confirmed"""
-    s = Sitemap(
+    s = sitemap_cls(
         b"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.google.com/schemas/sitemap/0.84">
 <url xmlns="">
@@ -124,10 +141,10 @@ def test_sitemap_wrong_ns():
     ]
 
 
-def test_sitemap_wrong_ns2():
+def test_sitemap_wrong_ns2(sitemap_cls: type[Sitemap | _ExpatSitemap]):
     """We have seen sitemaps with wrongs ns. Presumably, Google still works
     with these, though is not 100% confirmed"""
-    s = Sitemap(
+    s = sitemap_cls(
         b"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset>
 <url xmlns="">
@@ -155,6 +172,51 @@ def test_sitemap_wrong_ns2():
     ]
 
 
+def test_sitemap_iterated_twice(sitemap_cls: type[Sitemap | _ExpatSitemap]):
+    s = sitemap_cls(
+        b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>http://www.example.com/1</loc></url>
+<url><loc>http://www.example.com/2</loc></url>
+</urlset>"""
+    )
+    expected = [
+        {"loc": "http://www.example.com/1"},
+        {"loc": "http://www.example.com/2"},
+    ]
+    assert list(s) == expected
+    assert list(s) == expected
+
+
+def test_sitemap_iterated_concurrently(
+    sitemap_cls: type[Sitemap | _ExpatSitemap], monkeypatch: pytest.MonkeyPatch
+):
+    # parse the document in several chunks
+    monkeypatch.setattr(_ExpatSitemap, "_chunk_size", 16)
+    s = sitemap_cls(
+        b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>http://www.example.com/1</loc><priority>1</priority></url>
+<url><loc>http://www.example.com/2</loc><priority>2</priority></url>
+<url><loc>http://www.example.com/3</loc><priority>3</priority></url>
+</urlset>"""
+    )
+    expected = [
+        {"loc": f"http://www.example.com/{i}", "priority": str(i)} for i in range(1, 4)
+    ]
+    assert list(zip(iter(s), iter(s), strict=True)) == [(e, e) for e in expected]
+    assert s.type == "urlset"
+
+
+def test_parse_lastmod():
+    assert parse_lastmod("2009-08-16") == datetime(2009, 8, 16)
+    assert parse_lastmod("2009-08-16T20:32:00+00:00") == datetime(2009, 8, 16)
+    assert parse_lastmod("2009-08") == datetime(2009, 8, 1)
+    assert parse_lastmod("2009") == datetime(2009, 1, 1)
+    with pytest.raises(ValueError, match="Invalid isoformat"):
+        parse_lastmod("not a date")
+
+
 def test_sitemap_urls_from_robots():
     robots = """User-agent: *
 Disallow: /aff/
@@ -182,9 +244,9 @@ Disallow: /forum/active/
     ]
 
 
-def test_sitemap_blanklines():
+def test_sitemap_blanklines(sitemap_cls: type[Sitemap | _ExpatSitemap]):
     """Assert we can deal with starting blank lines before <xml> tag"""
-    s = Sitemap(
+    s = sitemap_cls(
         b"""
 <?xml version="1.0" encoding="UTF-8"?>
 <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
@@ -216,8 +278,8 @@ def test_sitemap_blanklines():
     ]
 
 
-def test_comment():
-    s = Sitemap(
+def test_comment(sitemap_cls: type[Sitemap | _ExpatSitemap]):
+    s = sitemap_cls(
         b"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
     xmlns:xhtml="http://www.w3.org/1999/xhtml">
@@ -230,8 +292,8 @@ def test_comment():
     assert list(s) == [{"loc": "http://www.example.com/"}]
 
 
-def test_alternate():
-    s = Sitemap(
+def test_alternate(sitemap_cls: type[Sitemap | _ExpatSitemap]):
+    s = sitemap_cls(
         b"""<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
     xmlns:xhtml="http://www.w3.org/1999/xhtml">
@@ -259,8 +321,8 @@ def test_alternate():
     ]
 
 
-def test_xml_entity_expansion():
-    s = Sitemap(
+def test_xml_entity_expansion(sitemap_cls: type[Sitemap | _ExpatSitemap]):
+    s = sitemap_cls(
         b"""<?xml version="1.0" encoding="utf-8"?>
       <!DOCTYPE foo [
       <!ELEMENT foo ANY >
@@ -274,3 +336,21 @@ def test_xml_entity_expansion():
     """
     )
     assert list(s) == [{"loc": "http://127.0.0.1:8000/"}]
+
+
+def test_sitemap_malformed():
+    body = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>http://www.example.com/1</loc></url>
+<url><loc>http://www.example.com/2</loc></url>
+<url><loc>http://www.example.com/3</url>
+</urlset>"""
+    expected = [
+        {"loc": "http://www.example.com/1"},
+        {"loc": "http://www.example.com/2"},
+    ]
+    assert list(Sitemap(body))[:2] == expected
+    entries = []
+    with pytest.raises(expat.ExpatError):
+        entries.extend(_ExpatSitemap(body))
+    assert entries == expected